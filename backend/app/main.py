@@ -2,7 +2,8 @@ import os
 import logging
 import uuid
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, WebSocket
+import orjson
+from fastapi import FastAPI, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from app.services.deepgram_service import DeepgramService
@@ -64,16 +65,22 @@ app.add_middleware(
 )
 
 
+# Probe endpoint bodies never change, so serialize them once. A fresh Response
+# is still built per request because middleware mutates response headers.
+ROOT_BODY = orjson.dumps({"message": "EchoText Transcription API", "status": "running"})
+HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "transcription"})
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {"message": "EchoText Transcription API", "status": "running"}
+    return Response(content=ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "transcription"}
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 
 @app.websocket("/ws/transcribe")
@@ -82,10 +89,10 @@ async def websocket_transcribe(websocket: WebSocket):
     connection_id = str(uuid.uuid4())
     logger.info(f"New WebSocket connection: {connection_id}")
 
-    manager = await get_transcription_manager()
+    manager = get_transcription_manager()
 
-    # Create a new Deepgram service instance for this connection
-    service = DeepgramService(DEEPGRAM_API_KEY)
+    # Per-connection session state on top of the shared Deepgram client
+    service = DeepgramService.for_connection(deepgram_service.client)
 
     await manager.handle_transcription_websocket(websocket, connection_id, service)
 
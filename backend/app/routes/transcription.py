@@ -1,16 +1,39 @@
 import asyncio
 import logging
+import weakref
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
 from app.services.deepgram_service import DeepgramService
 from app.services.vad_service import get_vad_service
 
 logger = logging.getLogger(__name__)
 
+# Audio chunks buffered between the receive loop and the Deepgram sender
+# (~2.5 s with the frontend's 4096-sample, 256 ms chunks); the oldest chunk
+# is dropped when it overflows
+AUDIO_QUEUE_MAXSIZE = 10
+
+# Audio chunks buffered for the VAD consumer, with the same drop policy, so
+# VAD falling behind never stalls the receive loop
+VAD_QUEUE_MAXSIZE = 10
+
+# Upper bound on closing the Deepgram session when a client disconnects
+CLEANUP_TIMEOUT_S = 2.0
+
+# Pre-serialized connection confirmation frame
+CONNECTED_MESSAGE = orjson.dumps({
+    "type": "connected",
+    "message": "Transcription service ready"
+}).decode()
+
 
 class TranscriptionManager:
     def __init__(self, deepgram_service: DeepgramService):
         self.deepgram_service = deepgram_service
-        self.active_connections: dict[str, WebSocket] = {}
+        # Weak values: sockets drop out once their handler releases them
+        self.active_connections: weakref.WeakValueDictionary[str, WebSocket] = (
+            weakref.WeakValueDictionary()
+        )
 
     async def handle_transcription_websocket(
         self, websocket: WebSocket, connection_id: str, deepgram_service: DeepgramService
@@ -23,10 +46,15 @@ class TranscriptionManager:
         event_loop = asyncio.get_event_loop()
         deepgram_service.set_event_loop(event_loop)
 
+        # Decouple receiving from the client from sending to Deepgram and VAD
+        audio_queue: asyncio.Queue = asyncio.Queue(maxsize=AUDIO_QUEUE_MAXSIZE)
+        vad_queue: asyncio.Queue = asyncio.Queue(maxsize=VAD_QUEUE_MAXSIZE)
+        sender_task = None
+        vad_task = None
+
         try:
             # Define async callbacks
             async def on_transcript(text: str, is_final: bool):
-                print(" TRANSCRIPT FROM DEEPGRAM:", text)
                 await self._send_transcript(websocket, text, is_final)
             
             async def on_error(error):
@@ -46,19 +74,25 @@ class TranscriptionManager:
                 return
 
             # Send connection confirmation
-            await websocket.send_json({
-                "type": "connected",
-                "message": "Transcription service ready"
-            })
+            sender_task = asyncio.create_task(
+                self._forward_audio(audio_queue, deepgram_service)
+            )
+
+            await websocket.send_text(CONNECTED_MESSAGE)
 
             # Get VAD service
             vad_service = get_vad_service()
             
             # Callback for when VAD detects a complete utterance (for logging only)
-            async def on_utterance_detected(utterance_bytes: bytes):
+            async def on_utterance_detected(utterance_bytes: memoryview):
                 """Log when VAD detects complete utterance."""
                 logger.info(f"✅ VAD detected complete utterance: {len(utterance_bytes)} bytes")
 
+            if vad_service:
+                vad_task = asyncio.create_task(
+                    self._run_vad(vad_queue, vad_service, connection_id, on_utterance_detected)
+                )
+
             # Track audio chunks for logging
             audio_chunk_count = 0
             total_audio_bytes = 0
@@ -66,32 +100,30 @@ class TranscriptionManager:
             # Receive audio data and send to both Deepgram and VAD
             while True:
                 try:
-                    # Receive audio data (expecting binary)
-                    data = await websocket.receive_bytes()
+                    # Receive audio data (expecting binary); the raw ASGI message
+                    # skips the extra state checks done by receive_bytes()
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        raise WebSocketDisconnect(message.get("code", 1000))
+                    data = message.get("bytes")
                     
                     if data:
                         audio_chunk_count += 1
                         total_audio_bytes += len(data)
                         
                         # Log every 50th chunk (approximately every second at 16kHz)
-                        if audio_chunk_count % 50 == 0:
+                        if audio_chunk_count % 50 == 0 and logger.isEnabledFor(logging.DEBUG):
                             logger.debug(
-                                f"📥 Received audio chunk #{audio_chunk_count}: "
-                                f"{len(data)} bytes (total: {total_audio_bytes} bytes)"
+                                "📥 Received audio chunk #%d: %d bytes (total: %d bytes)",
+                                audio_chunk_count, len(data), total_audio_bytes
                             )
                         
-                        # Send audio continuously to Deepgram to prevent timeout
-                        # This ensures Deepgram receives audio even during silence
-                        success = await deepgram_service.send_audio(data)
-                        if not success and audio_chunk_count % 50 == 0:
-                            logger.warning("Failed to send audio to Deepgram")
-                        
-                        # Also process through VAD for speech detection (logging/debugging)
-                        await vad_service.process_audio_chunk(
-                            connection_id,
-                            data,
-                            on_utterance_detected
-                        )
+                        # VAD is advisory (logging/debugging): its own consumer task
+                        # overlaps it with the Deepgram send
+                        if vad_task:
+                            await self._enqueue_latest(vad_queue, data, "VAD")
+
+                        await self._enqueue_latest(audio_queue, data, "Deepgram send")
 
                 except WebSocketDisconnect:
                     logger.info(f"WebSocket disconnected: {connection_id}")
@@ -105,24 +137,93 @@ class TranscriptionManager:
             logger.error(f"Error in transcription WebSocket: {e}")
             await self._send_error(websocket, f"Connection error: {str(e)}")
         finally:
-            # Cleanup
+            # Cleanup: VAD is advisory, so stop it without draining and free its
+            # state right away
+            if vad_task:
+                vad_task.cancel()
+                await asyncio.gather(vad_task, return_exceptions=True)
             vad_service = get_vad_service()
             if vad_service:
                 vad_service.cleanup_connection(connection_id)
-            await deepgram_service.close()
-            if connection_id in self.active_connections:
-                del self.active_connections[connection_id]
+            # Send the client's last queued audio before closing Deepgram. Both
+            # share the CLEANUP_TIMEOUT_S budget, with at least half kept for the
+            # close, so a slow drain or close can't hold the socket open
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + CLEANUP_TIMEOUT_S
+            if sender_task:
+                try:
+                    await asyncio.wait_for(
+                        self._drain_audio(audio_queue, sender_task),
+                        timeout=CLEANUP_TIMEOUT_S / 2
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Timed out sending remaining audio: {connection_id}")
+                except Exception as e:
+                    logger.error(f"Error sending remaining audio: {e}")
+                if not sender_task.done():
+                    sender_task.cancel()
+                    await asyncio.gather(sender_task, return_exceptions=True)
+            try:
+                await asyncio.wait_for(deepgram_service.close(), timeout=deadline - loop.time())
+            except asyncio.TimeoutError:
+                logger.warning(f"Timed out closing Deepgram connection: {connection_id}")
+            except Exception as e:
+                logger.error(f"Error closing Deepgram connection: {e}")
+            self.active_connections.pop(connection_id, None)
+
+    async def _drain_audio(self, audio_queue: asyncio.Queue, sender_task: asyncio.Task):
+        """Let the sender finish the queued audio and exit."""
+        if not sender_task.done():
+            # None tells the sender the stream has ended
+            await audio_queue.put(None)
+            await sender_task
+
+    async def _forward_audio(
+        self, audio_queue: asyncio.Queue, deepgram_service: DeepgramService
+    ):
+        """Send queued audio chunks to Deepgram in order, until a None sentinel."""
+        sent_count = 0
+        while True:
+            data = await audio_queue.get()
+            if data is None:
+                return
+            sent_count += 1
+            # Send audio continuously to Deepgram to prevent timeout
+            # This ensures Deepgram receives audio even during silence
+            success = await deepgram_service.send_audio(data)
+            if not success and sent_count % 50 == 0:
+                logger.warning("Failed to send audio to Deepgram")
+
+    async def _enqueue_latest(self, queue: asyncio.Queue, data: bytes, name: str):
+        """Queue a chunk for a consumer task, dropping the oldest one if it falls behind."""
+        if queue.full():
+            # Chunks can arrive in a burst without the loop yielding,
+            # so give the consumer a chance to drain first
+            await asyncio.sleep(0)
+        if queue.full():
+            queue.get_nowait()
+            logger.warning(f"{name} queue full, dropped oldest audio chunk")
+        queue.put_nowait(data)
+
+    async def _run_vad(self, vad_queue: asyncio.Queue, vad_service, connection_id: str, on_utterance_detected):
+        """Run queued audio chunks through VAD in order."""
+        while True:
+            data = await vad_queue.get()
+            try:
+                await vad_service.process_audio_chunk(connection_id, data, on_utterance_detected)
+            except Exception as e:
+                logger.error(f"Error processing audio through VAD: {e}")
 
     async def _send_transcript(self, websocket: WebSocket, text: str, is_final: bool):
         """Send transcription result to client."""
         try:
-            logger.info(f"📤 Sending transcript to client: '{text[:50]}...' (final: {is_final})")
-            await websocket.send_json({
+            logger.info("📤 Sending transcript to client: '%.50s...' (final: %s)", text, is_final)
+            await websocket.send_text(orjson.dumps({
                 "type": "transcript",
                 "text": text,
                 "is_final": is_final
-            })
-            logger.info(f"✅ Transcript sent successfully to client")
+            }).decode())
+            logger.debug("✅ Transcript sent successfully to client")
         except Exception as e:
             logger.error(f"❌ Error sending transcript: {e}")
             logger.exception(e)
@@ -130,10 +231,10 @@ class TranscriptionManager:
     async def _send_error(self, websocket: WebSocket, error_message: str):
         """Send error message to client."""
         try:
-            await websocket.send_json({
+            await websocket.send_text(orjson.dumps({
                 "type": "error",
                 "message": error_message
-            })
+            }).decode())
         except Exception as e:
             logger.error(f"Error sending error message: {e}")
 
@@ -142,7 +243,7 @@ class TranscriptionManager:
 transcription_manager: TranscriptionManager = None
 
 
-async def get_transcription_manager() -> TranscriptionManager:
+def get_transcription_manager() -> TranscriptionManager:
     """Get the global transcription manager instance."""
     return transcription_manager
 
@@ -1,25 +1,54 @@
 import asyncio
 import json
 import logging
+import queue
 from typing import Optional, Callable
 from deepgram import DeepgramClient, LiveTranscriptionEvents
 from deepgram.clients.live.v1 import LiveOptions
 
 logger = logging.getLogger(__name__)
 
+# Coalesce small audio chunks into larger Deepgram frames. The bundled frontend
+# already sends 8192-byte chunks, which bypass the buffer; only clients sending
+# smaller chunks are coalesced
+SEND_BUFFER_BYTES = 8192  # flush once this much audio is buffered (~256 ms)
+SEND_FLUSH_INTERVAL_S = 0.1  # flush whatever is buffered after this delay
+
+# KeepAlive control message, sent every few seconds to hold the stream open
+KEEPALIVE_MESSAGE = json.dumps({"type": "KeepAlive"})
+
+# Transcript event resolved once at import (v3 uses Transcript, older builds Results)
+TRANSCRIPT_EVENT = getattr(LiveTranscriptionEvents, "Transcript", None) or getattr(
+    LiveTranscriptionEvents, "Results", None
+)
+
 
 class DeepgramService:
-    def __init__(self, api_key: str):
-        """Initialize Deepgram service with API key."""
+    def __init__(self, api_key: str, client: Optional[DeepgramClient] = None):
+        """Initialize Deepgram service with API key, optionally reusing a client."""
         self.api_key = api_key
-        self.client = DeepgramClient(api_key)
+        self.client = client or DeepgramClient(api_key)
         self.connection = None
         self.on_transcript: Optional[Callable] = None
         self.on_error: Optional[Callable] = None
         self._event_loop: Optional[asyncio.AbstractEventLoop] = None
         self._is_connected = False
+        self._open_event = asyncio.Event()
         self._keepalive_task: Optional[asyncio.Task] = None
         self._last_error: Optional[str] = None
+        self._send_buf = bytearray()
+        self._send_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        # Transcripts handed over from Deepgram's thread, drained on the event loop
+        self._transcript_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._transcript_ready = asyncio.Event()
+        self._transcript_wakeup_pending = False
+        self._transcript_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_connection(cls, client: DeepgramClient) -> "DeepgramService":
+        """Create a per-connection service that shares an existing DeepgramClient."""
+        return cls(client.api_key, client=client)
 
     def set_event_loop(self, loop: asyncio.AbstractEventLoop):
         """Set the event loop for thread-safe async callbacks."""
@@ -56,67 +85,49 @@ class DeepgramService:
             # Create live connection
             self.connection = self.client.listen.live.v("1")
 
-            # Check available events for debugging
-            available_events = [
-                attr
-                for attr in dir(LiveTranscriptionEvents)
-                if not attr.startswith("_")
-            ]
-            logger.info(f"Available Deepgram events: {available_events}")
-
             # Register ALL event handlers BEFORE calling start()
             self.connection.on(LiveTranscriptionEvents.Open, self._on_open)
 
-            # Use Transcript event (v3) - this is the correct event name
-            if hasattr(LiveTranscriptionEvents, "Transcript"):
-                self.connection.on(LiveTranscriptionEvents.Transcript, self._on_results)
-                logger.info("Registered LiveTranscriptionEvents.Transcript handler")
-            else:
-                # Fallback if Transcript doesn't exist (shouldn't happen in v3)
-                logger.warning("Transcript event not found, trying Results")
-                if hasattr(LiveTranscriptionEvents, "Results"):
-                    self.connection.on(
-                        LiveTranscriptionEvents.Results, self._on_results
-                    )
-                else:
-                    raise Exception(
-                        f"Could not find transcript event. Available: {available_events}"
-                    )
+            if TRANSCRIPT_EVENT is None:
+                available_events = [
+                    attr
+                    for attr in dir(LiveTranscriptionEvents)
+                    if not attr.startswith("_")
+                ]
+                raise Exception(
+                    f"Could not find transcript event. Available: {available_events}"
+                )
+            self.connection.on(TRANSCRIPT_EVENT, self._on_results)
 
             self.connection.on(LiveTranscriptionEvents.Error, self._on_error)
             self.connection.on(LiveTranscriptionEvents.Close, self._on_close)
 
             # Optional: Log all events for debugging
-            try:
-                if hasattr(self.connection, "on_any"):
+            if logger.isEnabledFor(logging.DEBUG) and hasattr(self.connection, "on_any"):
 
-                    def log_all_events(event, data):
-                        # Log important events at INFO level
-                        if event in ["Transcript", "Results", "Error", "Close"]:
-                            logger.info(f"🔔 Deepgram event '{event}' received")
-                        else:
-                            logger.debug(f"Deepgram event {event}: {data}")
+                def log_all_events(event, data):
+                    logger.debug(f"Deepgram event {event}: {data}")
 
+                try:
                     self.connection.on_any(log_all_events)
-            except:
-                pass  # on_any might not be available
+                except Exception:
+                    pass  # on_any might not be available
 
-            logger.info("All event handlers registered")
+            logger.debug("All event handlers registered")
 
             # Start connection (must be after .on() calls)
             if not self.connection.start(options):
                 raise Exception("Failed to start Deepgram connection")
 
             # Wait for connection to open
-            for _ in range(50):  # Wait up to 5 seconds
-                if self._is_connected:
-                    break
-                await asyncio.sleep(0.1)
-            else:
+            try:
+                await asyncio.wait_for(self._open_event.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
                 raise Exception("Deepgram connection did not open within timeout")
 
-            # Start keepalive task
+            # Start keepalive and transcript delivery tasks
             self._start_keepalive()
+            self._transcript_task = asyncio.create_task(self._dispatch_transcripts())
 
             logger.info("Deepgram live transcription started successfully")
             return True
@@ -138,8 +149,7 @@ class DeepgramService:
                 try:
                     await asyncio.sleep(5)  # Send every 5 seconds
                     if self._is_connected and self.connection:
-                        keepalive_msg = json.dumps({"type": "KeepAlive"})
-                        self.connection.send(keepalive_msg)
+                        self.connection.send(KEEPALIVE_MESSAGE)
                         logger.debug("Sent KeepAlive to Deepgram")
                 except Exception as e:
                     logger.error(f"Error sending KeepAlive: {e}")
@@ -151,151 +161,41 @@ class DeepgramService:
     def _on_open(self, *args, **kwargs):
         """Handle connection open event."""
         self._is_connected = True
+        # May fire on Deepgram's thread, so wake the waiter via the loop
+        if self._event_loop:
+            self._event_loop.call_soon_threadsafe(self._open_event.set)
+        else:
+            self._open_event.set()
         logger.info("Deepgram connection opened")
 
     def _on_results(self, *args, **kwargs):
         """Handle transcription results - called from Deepgram's thread."""
         try:
-            # Log all arguments to understand the callback signature
-            logger.info(f"🔔 Deepgram _on_results called with {len(args)} args")
-            for i, arg in enumerate(args):
-                arg_type = type(arg).__name__
-                logger.info(f"  args[{i}]: type={arg_type}")
-                # If it's not LiveClient or DeepgramClient, it might be the result
-                if "LiveClient" not in arg_type and "DeepgramClient" not in arg_type:
-                    logger.info(f"    -> This might be the result object!")
-
-            # The first argument is often the connection (LiveClient)
-            # The result is typically the second argument or in kwargs
-            result = None
-
-            # Try args[1] if it exists (result is usually second after connection)
-            if len(args) > 1:
-                result = args[1]
-                logger.info(f"Using args[1] as result: type={type(result).__name__}")
-            elif len(args) == 1:
-                # Only one arg - check if it's actually the result (not connection)
-                arg = args[0]
-                arg_type_name = type(arg).__name__
-                # If it's not LiveClient, it might be the result
-                if "LiveClient" not in arg_type_name:
-                    result = arg
-                    logger.info(f"Using args[0] as result: type={arg_type_name}")
-                else:
-                    # It's the connection, try kwargs
-                    result = (
-                        kwargs.get("result")
-                        or kwargs.get("data")
-                        or kwargs.get("message")
-                    )
-                    if result:
-                        logger.info(
-                            f"Using kwargs result: type={type(result).__name__}"
-                        )
-
-            if not result:
-                logger.warning(
-                    f"⚠️ Could not find result object. Args count: {len(args)}, kwargs keys: {list(kwargs.keys())}"
-                )
-                # Try to inspect args[0] to see if result is nested
-                if args:
-                    first_arg = args[0]
-                    logger.debug(f"First arg type: {type(first_arg).__name__}")
-                    # Check if result is an attribute of the connection
-                    if hasattr(first_arg, "result"):
-                        result = first_arg.result
-                        logger.info(
-                            f"Found result in args[0].result: type={type(result).__name__}"
-                        )
-                    elif hasattr(first_arg, "data"):
-                        result = first_arg.data
-                        logger.info(
-                            f"Found result in args[0].data: type={type(result).__name__}"
-                        )
-
-                if not result:
-                    return
-
-            # Log that we received a result (INFO level for visibility)
-            logger.info(f"🔔 Deepgram result object: type={type(result).__name__}")
-
-            # Log raw result for debugging
-            logger.debug(f"Deepgram raw result type: {type(result)}")
-            result_attrs = [x for x in dir(result) if not x.startswith("_")]
-            logger.debug(f"Deepgram result attributes (first 20): {result_attrs[:20]}")
-
-            # Extract transcript text from Deepgram result structure
-            transcript_text = ""
-            is_final = False
-
-            # Try different result structures
+            # Fast path: SDK v3 emits (LiveClient, result=LiveResultResponse)
             try:
-                # Most common structure: result.channel.alternatives[0].transcript
-                if hasattr(result, "channel"):
-                    channels = result.channel
-                    if channels:
-                        if isinstance(channels, list) and len(channels) > 0:
-                            channel = channels[0]
-                        else:
-                            channel = channels
-
-                        if hasattr(channel, "alternatives") and channel.alternatives:
-                            transcript_text = channel.alternatives[0].transcript
-                            is_final = getattr(result, "is_final", False)
-                            logger.debug(
-                                f"Extracted from channel.alternatives: '{transcript_text}' (final: {is_final})"
-                            )
-
-                # Fallback: direct alternatives
-                if (
-                    not transcript_text
-                    and hasattr(result, "alternatives")
-                    and result.alternatives
-                ):
-                    transcript_text = result.alternatives[0].transcript
-                    is_final = getattr(result, "is_final", False)
-                    logger.debug(
-                        f"Extracted from alternatives: '{transcript_text}' (final: {is_final})"
-                    )
-
-                # Fallback: sentence attribute
-                if not transcript_text and hasattr(result, "sentence"):
-                    transcript_text = result.sentence
-                    is_final = getattr(result, "is_final", False)
-                    logger.debug(
-                        f"Extracted from sentence: '{transcript_text}' (final: {is_final})"
-                    )
-
-            except Exception as e:
-                logger.error(f"Error extracting transcript from result: {e}")
-                logger.exception(e)
+                result = kwargs["result"]
+                transcript_text = result.channel.alternatives[0].transcript
+                is_final = result.is_final
+            except (KeyError, AttributeError, IndexError, TypeError):
+                transcript_text, is_final = self._extract_transcript_fallback(
+                    args, kwargs
+                )
 
             if transcript_text and self.on_transcript:
                 logger.info(
-                    f"📝 Transcript received: '{transcript_text}' (final: {is_final})"
+                    "📝 Transcript received: '%s' (final: %s)", transcript_text, is_final
                 )
-                # Schedule async callback in event loop (thread-safe)
+                # Hand off to the event loop (thread-safe)
                 if self._event_loop and self._event_loop.is_running():
-                    asyncio.run_coroutine_threadsafe(
-                        self._call_async_callback(
-                            self.on_transcript, transcript_text, is_final
-                        ),
-                        self._event_loop,
-                    )
+                    self._transcript_queue.put((transcript_text, is_final))
+                    # Only wake the loop if the consumer isn't already scheduled
+                    if not self._transcript_wakeup_pending:
+                        self._transcript_wakeup_pending = True
+                        self._event_loop.call_soon_threadsafe(
+                            self._transcript_ready.set
+                        )
                 else:
                     logger.warning("No event loop available for transcript callback")
-            elif not transcript_text:
-                logger.warning(
-                    "⚠️ Deepgram result received but no transcript text found - result structure may have changed"
-                )
-                # Log the result structure for debugging
-                try:
-                    if hasattr(result, "__dict__"):
-                        logger.debug(f"Result __dict__: {result.__dict__}")
-                    # Try to log as string representation
-                    logger.debug(f"Result string: {str(result)[:200]}")
-                except:
-                    pass
 
         except Exception as e:
             logger.error(f"Error processing transcription result: {e}")
@@ -305,6 +205,138 @@ class DeepgramService:
                     self._call_async_callback(self.on_error, e), self._event_loop
                 )
 
+    async def _dispatch_transcripts(self):
+        """Deliver queued transcripts to on_transcript, in arrival order."""
+        while True:
+            await self._transcript_ready.wait()
+            self._transcript_ready.clear()
+            self._transcript_wakeup_pending = False
+            while True:
+                try:
+                    transcript_text, is_final = self._transcript_queue.get_nowait()
+                except queue.Empty:
+                    break
+                await self._call_async_callback(
+                    self.on_transcript, transcript_text, is_final
+                )
+
+    def _extract_transcript_fallback(self, args: tuple, kwargs: dict):
+        """Probe unexpected result shapes for transcript text (slow path)."""
+        # The first argument is often the connection (LiveClient)
+        # The result is typically the second argument or in kwargs
+        result = None
+
+        # Try args[1] if it exists (result is usually second after connection)
+        if len(args) > 1:
+            result = args[1]
+            logger.info(f"Using args[1] as result: type={type(result).__name__}")
+        elif len(args) == 1:
+            # Only one arg - check if it's actually the result (not connection)
+            arg = args[0]
+            arg_type_name = type(arg).__name__
+            # If it's not LiveClient, it might be the result
+            if "LiveClient" not in arg_type_name:
+                result = arg
+                logger.info(f"Using args[0] as result: type={arg_type_name}")
+            else:
+                # It's the connection, try kwargs
+                result = (
+                    kwargs.get("result")
+                    or kwargs.get("data")
+                    or kwargs.get("message")
+                )
+                if result:
+                    logger.info(
+                        f"Using kwargs result: type={type(result).__name__}"
+                    )
+
+        if not result:
+            logger.warning(
+                f"⚠️ Could not find result object. Args count: {len(args)}, kwargs keys: {list(kwargs.keys())}"
+            )
+            # Try to inspect args[0] to see if result is nested
+            if args:
+                first_arg = args[0]
+                logger.debug(f"First arg type: {type(first_arg).__name__}")
+                # Check if result is an attribute of the connection
+                if hasattr(first_arg, "result"):
+                    result = first_arg.result
+                    logger.info(
+                        f"Found result in args[0].result: type={type(result).__name__}"
+                    )
+                elif hasattr(first_arg, "data"):
+                    result = first_arg.data
+                    logger.info(
+                        f"Found result in args[0].data: type={type(result).__name__}"
+                    )
+
+            if not result:
+                return "", False
+
+        logger.info(f"🔔 Deepgram result object: type={type(result).__name__}")
+
+        # Extract transcript text from Deepgram result structure
+        transcript_text = ""
+        is_final = False
+
+        # Try different result structures
+        try:
+            # Most common structure: result.channel.alternatives[0].transcript
+            if hasattr(result, "channel"):
+                channels = result.channel
+                if channels:
+                    if isinstance(channels, list) and len(channels) > 0:
+                        channel = channels[0]
+                    else:
+                        channel = channels
+
+                    if hasattr(channel, "alternatives") and channel.alternatives:
+                        transcript_text = channel.alternatives[0].transcript
+                        is_final = getattr(result, "is_final", False)
+                        logger.debug(
+                            f"Extracted from channel.alternatives: '{transcript_text}' (final: {is_final})"
+                        )
+
+            # Fallback: direct alternatives
+            if (
+                not transcript_text
+                and hasattr(result, "alternatives")
+                and result.alternatives
+            ):
+                transcript_text = result.alternatives[0].transcript
+                is_final = getattr(result, "is_final", False)
+                logger.debug(
+                    f"Extracted from alternatives: '{transcript_text}' (final: {is_final})"
+                )
+
+            # Fallback: sentence attribute
+            if not transcript_text and hasattr(result, "sentence"):
+                transcript_text = result.sentence
+                is_final = getattr(result, "is_final", False)
+                logger.debug(
+                    f"Extracted from sentence: '{transcript_text}' (final: {is_final})"
+                )
+
+        except Exception as e:
+            logger.error(f"Error extracting transcript from result: {e}")
+            logger.exception(e)
+
+        if not transcript_text:
+            logger.warning(
+                "⚠️ Deepgram result received but no transcript text found - result structure may have changed"
+            )
+            # Log the result structure for debugging
+            try:
+                if hasattr(result, "__dict__"):
+                    logger.debug(f"Result __dict__: {result.__dict__}")
+                # Try to log as string representation
+                logger.debug(f"Result string: {str(result)[:200]}")
+            except:
+                pass
+
+        return transcript_text, is_final
+
+
     async def _call_async_callback(self, callback: Callable, *args):
         """Helper to call async callbacks."""
         try:
@@ -342,7 +374,7 @@ class DeepgramService:
             self._keepalive_task.cancel()
 
     async def send_audio(self, audio_data: bytes):
-        """Send audio data to Deepgram."""
+        """Buffer audio data for Deepgram, flushing once enough has accumulated."""
         if not self.connection:
             logger.warning("Cannot send audio: No Deepgram connection")
             return False
@@ -355,18 +387,57 @@ class DeepgramService:
             logger.warning("Cannot send empty audio data")
             return False
 
+        if not self._send_buf and len(audio_data) >= SEND_BUFFER_BYTES:
+            # Already frame-sized (as the bundled frontend's chunks are): send it
+            # as-is instead of copying it through the buffer
+            async with self._send_lock:
+                return await self._send_locked(audio_data)
+
+        self._send_buf.extend(audio_data)
+        if len(self._send_buf) >= SEND_BUFFER_BYTES:
+            return await self._flush_audio()
+
+        # Make sure buffered audio goes out even if no more chunks arrive
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_audio_later())
+        return True
+
+    async def _flush_audio_later(self):
+        """Flush buffered audio after the coalescing interval."""
+        await asyncio.sleep(SEND_FLUSH_INTERVAL_S)
+        await self._flush_audio()
+
+    async def _flush_audio(self):
+        """Send all buffered audio to Deepgram as a single frame."""
+        # The lock keeps frames in order when the size and timer flushes overlap
+        async with self._send_lock:
+            return await self._flush_audio_locked()
+
+    async def _flush_audio_locked(self):
+        """Send buffered audio; the caller must hold _send_lock."""
+        if not self._send_buf or not self.connection:
+            return True
+
+        audio_data = bytes(self._send_buf)
+        self._send_buf.clear()
+        return await self._send_locked(audio_data)
+
+    async def _send_locked(self, audio_data: bytes):
+        """Send one frame to Deepgram; the caller must hold _send_lock."""
         try:
-            self.connection.send(audio_data)
+            # The SDK's socket write is blocking; keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.connection.send, audio_data)
             # Log periodically (every 100 sends) to avoid spam
             if not hasattr(self, "_send_count"):
                 self._send_count = 0
             self._send_count += 1
             if self._send_count % 100 == 0:
                 logger.info(
-                    f"📤 Sent {self._send_count} audio chunks to Deepgram (last: {len(audio_data)} bytes)"
+                    "📤 Sent %d audio frames to Deepgram (last: %d bytes)",
+                    self._send_count, len(audio_data)
                 )
             else:
-                logger.debug(f"Sent {len(audio_data)} bytes to Deepgram")
+                logger.debug("Sent %d bytes to Deepgram", len(audio_data))
             return True
         except Exception as e:
             logger.error(f"Error sending audio to Deepgram: {e}")
@@ -378,20 +449,46 @@ class DeepgramService:
 
     async def finish(self):
         """Finish and close the connection."""
-        if self._keepalive_task:
-            self._keepalive_task.cancel()
-            try:
-                await self._keepalive_task
-            except asyncio.CancelledError:
-                pass
+        try:
+            if self._flush_task:
+                self._flush_task.cancel()
+                try:
+                    await self._flush_task
+                except asyncio.CancelledError:
+                    pass
 
-        if self.connection:
-            try:
-                self.connection.finish()
-                self._is_connected = False
-                logger.info("Deepgram connection finished")
-            except Exception as e:
-                logger.error(f"Error finishing Deepgram connection: {e}")
+            # Send any audio still waiting in the coalescing buffer
+            if self._is_connected:
+                await self._flush_audio()
+            self._send_buf.clear()
+
+            if self._keepalive_task:
+                self._keepalive_task.cancel()
+                try:
+                    await self._keepalive_task
+                except asyncio.CancelledError:
+                    pass
+
+            if self.connection:
+                try:
+                    # finish() joins the SDK's threads; keep it off the event loop
+                    await asyncio.get_running_loop().run_in_executor(None, self.connection.finish)
+                    self._is_connected = False
+                    logger.info("Deepgram connection finished")
+                except Exception as e:
+                    logger.error(f"Error finishing Deepgram connection: {e}")
+        finally:
+            # Also runs when finish() is cancelled part-way (e.g. a close timeout),
+            # so no background task outlives the session
+            for task in (self._flush_task, self._keepalive_task):
+                if task:
+                    task.cancel()
+            if self._transcript_task:
+                self._transcript_task.cancel()
+                try:
+                    await self._transcript_task
+                except asyncio.CancelledError:
+                    pass
 
     async def close(self):
         """Close the connection."""
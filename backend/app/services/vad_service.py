@@ -1,6 +1,9 @@
-import time
+import asyncio
+import itertools
 import collections
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 try:
@@ -11,6 +14,18 @@ except ImportError:
     TORCH_AVAILABLE = False
     logging.warning("PyTorch not available. VAD will be disabled.")
 
+try:
+    import onnxruntime  # noqa: F401
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # =========================================================
@@ -20,11 +35,14 @@ SAMPLE_RATE = 16000
 FRAME_DURATION_MS = 32
 FRAME_SAMPLES = int(SAMPLE_RATE * FRAME_DURATION_MS / 1000)
 FRAME_BYTES = FRAME_SAMPLES * 2  # int16
+INT16_SCALE = np.float32(1.0 / 32768.0)
 
 # =========================================================
 # NOISE-ROBUST TUNING
 # =========================================================
 RMS_NOISE_GATE = 0.01          # blocks fan/AC noise
+# Gate expressed as a per-frame sum of squares, so the hot path needs no sqrt/mean
+RMS_GATE_SUM_SQUARES = RMS_NOISE_GATE ** 2 * FRAME_SAMPLES
 STRONG_SPEECH_PROB = 0.85     # confident speech
 WEAK_SPEECH_PROB = 0.50       # confident non-speech
 
@@ -37,6 +55,36 @@ SPEECH_BUFFER_FRAMES = SPEECH_BUFFER_DURATION_MS // FRAME_DURATION_MS
 SPEECH_TRIGGER_RATIO = 0.90   # speech start
 SPEECH_RELEASE_RATIO = 0.25   # speech end
 
+# While idle (out of speech, ratio below IDLE_SPEECH_RATIO), quiet frames just
+# above the noise gate only reach the model every IDLE_MODEL_STRIDE frames
+IDLE_SPEECH_RATIO = 0.20
+IDLE_RMS_GATE_SUM_SQUARES = (RMS_NOISE_GATE * 1.5) ** 2 * FRAME_SAMPLES
+IDLE_MODEL_STRIDE = 2
+
+
+def _min_speech_frames(total_frames: int, ratio: float, floor: int = 0) -> int:
+    """Smallest speech frame count reaching ratio of total_frames (and floor)."""
+    if total_frames == 0:
+        return 0
+    for count in range(floor, total_frames + 1):
+        if count / total_frames >= ratio:
+            return count
+    return total_frames + 1
+
+
+# Integer thresholds indexed by the number of frames in the decision window,
+# so the per-frame checks compare counts instead of dividing
+SPEECH_TRIGGER_COUNTS = tuple(
+    _min_speech_frames(n, SPEECH_TRIGGER_RATIO, int(0.6 * n))
+    for n in range(SPEECH_BUFFER_FRAMES + 1)
+)
+SPEECH_RELEASE_COUNTS = tuple(
+    _min_speech_frames(n, SPEECH_RELEASE_RATIO) for n in range(SPEECH_BUFFER_FRAMES + 1)
+)
+IDLE_SPEECH_COUNTS = tuple(
+    _min_speech_frames(n, IDLE_SPEECH_RATIO) for n in range(SPEECH_BUFFER_FRAMES + 1)
+)
+
 # =========================================================
 # UTTERANCE CONTROL
 # =========================================================
@@ -49,47 +97,449 @@ PRE_SPEECH_FRAMES = PRE_SPEECH_MS // FRAME_DURATION_MS
 TRAILING_SILENCE_MS = 700
 TRAILING_SILENCE_FRAMES = TRAILING_SILENCE_MS // FRAME_DURATION_MS
 
+# Speech buffers are preallocated to this size; longer utterances grow them
+MAX_UTTERANCE_DURATION_S = 10
+MAX_UTTERANCE_BYTES = SAMPLE_RATE * MAX_UTTERANCE_DURATION_S * 2
+
+# =========================================================
+# PCM CONVERSION
+# =========================================================
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _pcm_to_f32_sum_squares_kernel(src, out, sum_squares, scale):
+        for row in range(src.shape[0]):
+            s = 0.0
+            for i in range(src.shape[1]):
+                v = src[row, i] * scale
+                out[row, i] = v
+                s += v * v
+            sum_squares[row] = s
+
+
+def pcm_to_f32_sum_squares(src: np.ndarray, out: np.ndarray, sum_squares: np.ndarray):
+    """Scale (frames, samples) int16 PCM into float32 and each frame's sum of squares.
+
+    Conversion and the RMS gate's energy share a single pass over the samples.
+    """
+    if NUMBA_AVAILABLE:
+        _pcm_to_f32_sum_squares_kernel(src, out, sum_squares, INT16_SCALE)
+    else:
+        np.multiply(src, INT16_SCALE, out=out)
+        np.einsum("ij,ij->i", out, out, out=sum_squares)
+
+
+# =========================================================
+# DECISION STATE MACHINE
+# =========================================================
+# Layout of VadState.decision
+DEC_IDX, DEC_COUNT, DEC_FULL, DEC_IN_SPEECH, DEC_TRAILING_SILENCE = range(5)
+
+# Per-frame actions returned by step_decisions()
+ACTION_IDLE, ACTION_START, ACTION_CONTINUE, ACTION_END = range(4)
+
+
+def _step_decisions_kernel(speech_probs, dec_ring, decision, actions):
+    for i in range(speech_probs.shape[0]):
+        # Probability-weighted decision: only confident frames count as speech,
+        # uncertain ones (between WEAK_ and STRONG_SPEECH_PROB) are treated as noise
+        is_speech = speech_probs[i] > STRONG_SPEECH_PROB
+
+        # Update rolling window of decisions (ring buffer), keeping the count in O(1)
+        idx = decision[DEC_IDX]
+        decision[DEC_COUNT] += int(is_speech) - int(dec_ring[idx])
+        dec_ring[idx] = is_speech
+        idx = (idx + 1) % SPEECH_BUFFER_FRAMES
+        decision[DEC_IDX] = idx
+        if idx == 0:
+            decision[DEC_FULL] = 1
+
+        speech_frames = decision[DEC_COUNT]
+        total_frames = SPEECH_BUFFER_FRAMES if decision[DEC_FULL] else idx
+
+        if not decision[DEC_IN_SPEECH]:
+            if speech_frames >= SPEECH_TRIGGER_COUNTS[total_frames]:
+                decision[DEC_IN_SPEECH] = 1
+                decision[DEC_TRAILING_SILENCE] = 0
+                actions[i] = ACTION_START
+            else:
+                actions[i] = ACTION_IDLE
+        elif speech_frames < SPEECH_RELEASE_COUNTS[total_frames]:
+            decision[DEC_TRAILING_SILENCE] += 1
+            if decision[DEC_TRAILING_SILENCE] == TRAILING_SILENCE_FRAMES:
+                # Utterance over: the next frame starts from an empty window
+                dec_ring[:] = False
+                decision[:] = 0
+                actions[i] = ACTION_END
+            else:
+                actions[i] = ACTION_CONTINUE
+        else:
+            decision[DEC_TRAILING_SILENCE] = 0
+            actions[i] = ACTION_CONTINUE
+
+
+if NUMBA_AVAILABLE:
+    # Thresholds and window sizes are module constants, baked in at compile time
+    _step_decisions_kernel = njit(cache=True)(_step_decisions_kernel)
+
+
+def step_decisions(speech_probs: np.ndarray, dec_ring: np.ndarray, decision: np.ndarray) -> np.ndarray:
+    """Run the speech state machine over a window of probabilities.
+
+    Updates dec_ring and decision in place and returns one ACTION_* code per
+    frame; the caller only has to move audio and emit utterances.
+    """
+    actions = np.empty(len(speech_probs), dtype=np.int8)
+    _step_decisions_kernel(speech_probs, dec_ring, decision, actions)
+    return actions
+
+
+# =========================================================
+# BUFFER POOLS
+# =========================================================
+FLOAT32_POOL_SIZE = 32
+PCM_POOL_SIZE = 8
+
+
+class BufferPool:
+    """Thread-safe pool of reusable buffers."""
+
+    def __init__(self, factory, capacity: int, reset=None):
+        self.factory = factory
+        self.capacity = capacity
+        self.reset = reset
+        self._buffers = collections.deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a buffer from the pool, allocating one if it is empty."""
+        with self._lock:
+            if self._buffers:
+                return self._buffers.pop()
+        return self.factory()
+
+    def release(self, buffer):
+        """Return a buffer to the pool (dropped if the pool is full)."""
+        if self.reset is not None:
+            self.reset(buffer)
+        with self._lock:
+            if len(self._buffers) < self.capacity:
+                self._buffers.append(buffer)
+
+
+class PcmBuffer:
+    """Preallocated PCM byte buffer; clearing keeps its memory for reuse."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = bytearray(capacity)
+        self.size = 0
+
+    def extend(self, chunk):
+        """Append bytes, growing the underlying bytearray only past its capacity."""
+        end = self.size + len(chunk)
+        self.data[self.size:end] = chunk
+        self.size = end
+
+    def clear(self):
+        self.size = 0
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the bytes written so far."""
+        return memoryview(self.data)[:self.size]
+
+    def exported(self) -> bool:
+        """True while a memoryview (or a slice of one) still references the data."""
+        # Resizing a bytearray with live exports raises BufferError
+        try:
+            last = self.data.pop()
+        except BufferError:
+            return True
+        self.data.append(last)
+        return False
+
+    def __len__(self):
+        return self.size
+
+
+def _reset_pcm_buffer(buffer: PcmBuffer):
+    """Empty a speech buffer before it goes back to the pool."""
+    buffer.clear()
+    # Give back memory from unusually long utterances
+    if len(buffer.data) > MAX_UTTERANCE_BYTES:
+        del buffer.data[MAX_UTTERANCE_BYTES:]
+
+
+float32_pool = BufferPool(
+    lambda: np.empty((SPEECH_BUFFER_FRAMES, FRAME_SAMPLES), dtype=np.float32),
+    FLOAT32_POOL_SIZE,
+)
+pcm_buffer_pool = BufferPool(
+    lambda: PcmBuffer(MAX_UTTERANCE_BYTES), PCM_POOL_SIZE, reset=_reset_pcm_buffer
+)
+
+# =========================================================
+# CROSS-CONNECTION BATCHING
+# =========================================================
+MAX_BATCH_FRAMES = 64     # frames per model call across all connections
+BATCH_WAIT_MS = 5         # how long to wait for other connections to join a batch
+
+# Silero recurrent state carried per connection (raw graph inputs)
+RNN_STATE_SHAPE = (2, 128)
+CONTEXT_SAMPLES = 64      # trailing samples of the previous frame prepended to each input
+
+
+class VadBatcher:
+    """Coalesce VAD requests from concurrent connections into shared model calls.
+
+    The wrappers returned by torch.hub keep a single recurrent state for the
+    whole batch, so the raw graph underneath is called directly instead (the
+    ONNX Runtime session, or the TorchScript wrapper's 16 kHz submodule; both
+    take the same inputs). Each connection carries its own recurrent state and
+    audio context; frames of one connection are stepped in order, batched
+    across connections.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.session = getattr(model, "session", None)
+        if self.session is not None:
+            self._sample_rate = np.array(SAMPLE_RATE, dtype=np.int64)
+            self._forward = self._forward_onnx
+        else:
+            self._graph = model._model
+            self._forward = self._forward_torchscript
+        self._input = np.empty((MAX_BATCH_FRAMES, CONTEXT_SAMPLES + FRAME_SAMPLES), dtype=np.float32)
+        self._rnn_state = np.empty((MAX_BATCH_FRAMES,) + RNN_STATE_SHAPE, dtype=np.float32)
+        # Batches run one at a time off the event loop; requests arriving
+        # meanwhile queue up and join the next batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vad")
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    async def infer(self, state: "VadState", audio_f32: np.ndarray) -> np.ndarray:
+        """Return speech probabilities for each consecutive (FRAME_SAMPLES,) row of audio_f32."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+        future = loop.create_future()
+        # Counted until the batch holding this request is done with the state
+        state.inflight += 1
+        self._queue.put_nowait((state, audio_f32, future))
+        return await future
+
+    async def _run(self):
+        """Gather queued requests for up to BATCH_WAIT_MS, then run them together."""
+        while True:
+            requests = [await self._queue.get()]
+            num_frames = len(requests[0][1])
+            deadline = self._loop.time() + BATCH_WAIT_MS / 1000
+            while num_frames < MAX_BATCH_FRAMES:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                requests.append(request)
+                num_frames += len(request[1])
+
+            # Requests of cancelled VAD tasks (e.g. closed connections) must not
+            # touch their state any more, it may already be reset for reuse
+            live = []
+            for request in requests:
+                if request[2].cancelled():
+                    request[0].inflight -= 1
+                else:
+                    live.append(request)
+            if not live:
+                continue
+            requests = live
+
+            try:
+                results = await self._loop.run_in_executor(
+                    self._executor, self._run_stateful, requests
+                )
+            except Exception as e:
+                for state, _, future in requests:
+                    state.inflight -= 1
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (state, _, future), speech_probs in zip(requests, results):
+                state.inflight -= 1
+                if not future.done():
+                    future.set_result(speech_probs)
+
+    def _run_stateful(self, requests: list) -> list:
+        """Step each connection's frames through the raw graph with its own state."""
+        results = [np.empty(len(audio), dtype=np.float32) for _, audio, _ in requests]
+        for step in range(max(len(audio) for _, audio, _ in requests)):
+            active = [i for i, (_, audio, _) in enumerate(requests) if step < len(audio)]
+            for start in range(0, len(active), MAX_BATCH_FRAMES):
+                group = active[start:start + MAX_BATCH_FRAMES]
+                batch_size = len(group)
+                for row, i in enumerate(group):
+                    state, audio, _ = requests[i]
+                    self._input[row, :CONTEXT_SAMPLES] = state.context
+                    self._input[row, CONTEXT_SAMPLES:] = audio[step]
+                    self._rnn_state[row] = state.rnn_state
+
+                out, new_state = self._forward(
+                    self._input[:batch_size],
+                    self._rnn_state[:batch_size].transpose(1, 0, 2)
+                )
+
+                for row, i in enumerate(group):
+                    state, audio, _ = requests[i]
+                    results[i][step] = out[row, 0]
+                    state.rnn_state[...] = new_state[:, row]
+                    state.context[...] = audio[step, -CONTEXT_SAMPLES:]
+        return results
+
+    def _forward_onnx(self, audio: np.ndarray, rnn_state: np.ndarray):
+        out, new_state = self.session.run(None, {
+            "input": audio,
+            "state": rnn_state,
+            "sr": self._sample_rate,
+        })
+        return out, new_state
+
+    def _forward_torchscript(self, audio: np.ndarray, rnn_state: np.ndarray):
+        with torch.inference_mode():
+            out, new_state = self._graph(torch.from_numpy(audio), torch.from_numpy(rnn_state))
+        return out.numpy(), new_state.numpy()
+
+
 # =========================================================
 # STATE
 # =========================================================
+STATE_POOL_SIZE = 32      # VadState objects kept for reuse by new connections
+
+
 class VadState:
+    __slots__ = (
+        "window_f32", "speech_buffer", "lock", "inflight", "rnn_state", "context",
+        "pre_ring", "pre_ring_view", "pre_head", "pre_filled",
+        "partial_frame", "pending_frames",
+        "dec_ring", "decision", "idle_skip_counter",
+        "current_utterance_id",
+    )
+
     def __init__(self):
+        # Inference scratch kept for the connection's lifetime; the speech
+        # buffer is only taken from the pool while an utterance is in progress
+        self.window_f32 = float32_pool.acquire()
+        self.speech_buffer = None
+        # Chunks of one connection must be processed in order, one at a time
+        self.lock = asyncio.Lock()
+        # Batcher requests queued or running for this state
+        self.inflight = 0
+        # Silero recurrent state and audio context, carried across utterances
+        self.rnn_state = np.zeros(RNN_STATE_SHAPE, dtype=np.float32)
+        self.context = np.zeros(CONTEXT_SAMPLES, dtype=np.float32)
+        # Pre-speech audio as one contiguous ring of PRE_SPEECH_FRAMES frames
+        self.pre_ring = bytearray(PRE_SPEECH_FRAMES * FRAME_BYTES)
+        self.pre_ring_view = memoryview(self.pre_ring)
+        # Audio not yet run through the model; kept across utterance resets
+        self.partial_frame = bytearray()
+        self.pending_frames = []
+        # Rolling window of per-frame speech decisions, and the state machine's
+        # counters and flags (indexed by the DEC_* constants)
+        self.dec_ring = np.zeros(SPEECH_BUFFER_FRAMES, dtype=np.bool_)
+        self.decision = np.zeros(5, dtype=np.int64)
         self.reset()
 
-    def reset(self):
-        self.speech_buffer = bytearray()
-        self.pre_speech_buffer = collections.deque(maxlen=PRE_SPEECH_FRAMES)
-        self.vad_decision_buffer = collections.deque(maxlen=SPEECH_BUFFER_FRAMES)
-        self.trailing_silence_buffer = collections.deque(maxlen=TRAILING_SILENCE_FRAMES)
+    def reset_stream(self):
+        """Reset everything, including state carried across utterances, for reuse by a new connection."""
+        self.rnn_state.fill(0)
+        self.context.fill(0)
+        self.partial_frame.clear()
+        self.pending_frames.clear()
+        self.reset()
 
-        self.in_speech = False
-        self.speech_start_time = None
+    def reset(self):
+        self.dec_ring.fill(False)
+        self.decision.fill(0)
+        self.end_utterance()
+
+    def end_utterance(self):
+        """Reset the audio side of an utterance; step_decisions() resets its own state."""
+        self.release_speech_buffer()
+        self.pre_head = 0
+        self.pre_filled = 0
+        self.idle_skip_counter = 0
         self.current_utterance_id = None
-        self.partial_frame = bytearray()
+
+    def release_speech_buffer(self):
+        """Return the speech buffer, if any, to the shared pool."""
+        if self.speech_buffer is not None:
+            pcm_buffer_pool.release(self.speech_buffer)
+            self.speech_buffer = None
 
 
 class VadService:
     def __init__(self):
         self.model = None
+        self.batcher = None
         self.vad_model_loaded = False
         self.connections = {}
-        
+        # Free list of VadState objects from closed connections
+        self._state_pool = []
+        self._utt_counter = itertools.count()
+        # Utterance callbacks still running, mapped to the speech buffer and view
+        # they were handed; the buffer goes back to the pool once they finish
+        self._pending = {}
+
+        # Compile the njit kernels now so the first real frame isn't penalized
+        # (real windows come from np.frombuffer, i.e. read-only arrays, which
+        # numba compiles as a separate signature)
+        pcm_to_f32_sum_squares(
+            np.frombuffer(bytes(FRAME_BYTES), dtype=np.int16).reshape(1, FRAME_SAMPLES),
+            np.empty((1, FRAME_SAMPLES), dtype=np.float32),
+            np.empty(1, dtype=np.float32)
+        )
+        step_decisions(
+            np.zeros(1, dtype=np.float32),
+            np.zeros(SPEECH_BUFFER_FRAMES, dtype=np.bool_),
+            np.zeros(5, dtype=np.int64)
+        )
+
         if TORCH_AVAILABLE:
             self._load_model()
         else:
             logger.warning("PyTorch not available. VAD disabled.")
 
     def _load_model(self):
-        """Load Silero VAD model."""
+        """Load Silero VAD model (ONNX Runtime build when available)."""
         try:
-            logger.info("Loading Silero VAD model...")
+            backend = "ONNX Runtime" if ONNXRUNTIME_AVAILABLE else "TorchScript"
+            logger.info(f"Loading Silero VAD model ({backend})...")
             self.model, _ = torch.hub.load(
                 repo_or_dir="snakers4/silero-vad",
                 model="silero_vad",
                 force_reload=False,
+                onnx=ONNXRUNTIME_AVAILABLE,
                 trust_repo=True  # Required for Windows
             )
-            self.model.eval()
+            if not ONNXRUNTIME_AVAILABLE:
+                self.model.eval()
+            # Small VAD batches gain little from intra-op parallelism, and extra
+            # threads only oversubscribe the CPU under many connections
+            torch.set_num_threads(1)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                # Can only be set once, before any inter-op parallel work
+                pass
+            self.batcher = VadBatcher(self.model)
             self.vad_model_loaded = True
             logger.info("✅ Silero VAD loaded successfully")
         except Exception as e:
@@ -100,16 +550,49 @@ class VadService:
 
     def get_state(self, connection_id: str) -> VadState:
         """Get or create VAD state for a connection."""
-        if connection_id not in self.connections:
-            self.connections[connection_id] = VadState()
-        return self.connections[connection_id]
+        state = self.connections.get(connection_id)
+        if state is None:
+            state = self._state_pool.pop() if self._state_pool else VadState()
+            self.connections[connection_id] = state
+        return state
 
     def cleanup_connection(self, connection_id: str):
         """Clean up VAD state for a disconnected client."""
-        if connection_id in self.connections:
-            del self.connections[connection_id]
+        state = self.connections.pop(connection_id, None)
+        if state is not None:
+            state.release_speech_buffer()
+            # A cancelled batcher request may still be queued or running; it
+            # writes to this state and reads its scratch window, so a state with
+            # requests in flight is dropped along with its window
+            if not state.inflight and len(self._state_pool) < STATE_POOL_SIZE:
+                # Nothing in flight: keep the state and its scratch window
+                # for the next connection
+                state.reset_stream()
+                self._state_pool.append(state)
+            elif not state.inflight:
+                # Only pool the scratch window once no request references it
+                float32_pool.release(state.window_f32)
             logger.info(f"🧹 VAD state cleaned for connection: {connection_id}")
 
+    def _on_utterance_task_done(self, task: asyncio.Task):
+        """Recycle a finished utterance callback's buffer and log any error it raised."""
+        buffer, utterance = self._pending.pop(task)
+        try:
+            utterance.release()
+        except BufferError:
+            # Re-exported by the callback (e.g. np.frombuffer)
+            pass
+        if not buffer.exported():
+            pcm_buffer_pool.release(buffer)
+        # Otherwise the callback kept (a slice of) the audio, so the buffer
+        # can't be reused; leave it to the garbage collector
+
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error:
+            logger.error(f"Error in utterance callback: {error}")
+
     async def process_audio_chunk(
         self,
         connection_id: str,
@@ -122,7 +605,9 @@ class VadService:
         Args:
             connection_id: Unique connection identifier
             audio_bytes: Raw PCM16 audio bytes
-            on_utterance_detected: Callback(utterance_bytes) when speech detected
+            on_utterance_detected: Callback(utterance) when speech detected. The
+                utterance is a read-only view of a pooled buffer, valid until the
+                callback returns; copy it with bytes() to keep it longer.
         """
         if not self.vad_model_loaded:
             # If VAD not available, pass through all audio
@@ -131,115 +616,161 @@ class VadService:
             return
 
         state = self.get_state(connection_id)
+        async with state.lock:
+            await self._process_chunk(state, audio_bytes, on_utterance_detected)
 
-        # Combine with any partial frame from previous chunk
+    async def _process_chunk(self, state: VadState, audio_bytes: bytes, on_utterance_detected):
+        """Split a chunk into frames and process every complete decision window."""
+        audio_view = memoryview(audio_bytes)
+
+        # Complete any partial frame from the previous chunk with the head of
+        # this one, so only that one frame is copied rather than the whole chunk
+        start = 0
         if state.partial_frame:
-            audio_bytes = bytes(state.partial_frame) + audio_bytes
-            state.partial_frame = bytearray()
-
-        # Process audio in frames (FRAME_BYTES each)
-        offset = 0
-        while offset < len(audio_bytes):
-            remaining = len(audio_bytes) - offset
-            if remaining >= FRAME_BYTES:
-                # Process complete frame
-                frame_bytes = audio_bytes[offset:offset + FRAME_BYTES]
-                await self._process_frame(state, frame_bytes, on_utterance_detected)
-                offset += FRAME_BYTES
-            else:
-                # Store partial frame for next chunk
-                state.partial_frame.extend(audio_bytes[offset:])
-                break
+            start = min(FRAME_BYTES - len(state.partial_frame), len(audio_view))
+            state.partial_frame.extend(audio_view[:start])
+            if len(state.partial_frame) < FRAME_BYTES:
+                return
+            state.pending_frames.append(bytes(state.partial_frame))
+            state.partial_frame.clear()
+
+        # Queue complete frames (FRAME_BYTES each); memoryview slices are
+        # zero-copy views into the chunk rather than new bytes objects
+        frames_end = len(audio_view) - (len(audio_view) - start) % FRAME_BYTES
+        for offset in range(start, frames_end, FRAME_BYTES):
+            state.pending_frames.append(audio_view[offset:offset + FRAME_BYTES])
+
+        # Store partial frame for next chunk
+        state.partial_frame.extend(audio_view[frames_end:])
+
+        # Run the model once over every complete decision window in the chunk
+        num_ready = len(state.pending_frames) - len(state.pending_frames) % SPEECH_BUFFER_FRAMES
+        if num_ready:
+            await self._process_window(state, num_ready, on_utterance_detected)
+
+    async def _process_window(self, state: VadState, num_frames: int, on_utterance_detected):
+        """Run the model over the first num_frames pending frames, then step the state machine."""
+        frames = state.pending_frames[:num_frames]
+        del state.pending_frames[:num_frames]
+
+        speech_probs = await self._infer_speech_probs(state, frames)
+        actions = step_decisions(speech_probs, state.dec_ring, state.decision)
+        for frame_view, action in zip(frames, actions):
+            await self._process_frame(state, frame_view, action, on_utterance_detected)
+
+    async def _infer_speech_probs(self, state: VadState, frames: list) -> np.ndarray:
+        """Return per-frame speech probabilities for a window of frames."""
+        num_frames = len(frames)
+        speech_probs = np.zeros(num_frames, dtype=np.float32)
+
+        # Convert PCM → float into the connection's scratch window, computing
+        # each frame's energy along the way; chunks spanning several decision
+        # windows get a one-off array
+        if num_frames <= len(state.window_f32):
+            audio_f32 = state.window_f32[:num_frames]
+        else:
+            audio_f32 = np.empty((num_frames, FRAME_SAMPLES), dtype=np.float32)
+        sum_squares = np.empty(num_frames, dtype=np.float32)
+        pcm_to_f32_sum_squares(
+            np.frombuffer(b"".join(frames), dtype=np.int16).reshape(num_frames, FRAME_SAMPLES),
+            audio_f32,
+            sum_squares
+        )
+
+        # RMS Noise Gate: only frames above the gate reach the model
+        voiced = sum_squares >= RMS_GATE_SUM_SQUARES
+
+        # Idle fast path: far from triggering, quiet frames are subsampled and
+        # skipped ones count as non-speech. At most one frame in a row is skipped
+        decision = state.decision
+        total_frames = SPEECH_BUFFER_FRAMES if decision[DEC_FULL] else decision[DEC_IDX]
+        if not decision[DEC_IN_SPEECH] and decision[DEC_COUNT] < IDLE_SPEECH_COUNTS[total_frames]:
+            quiet = voiced & (sum_squares < IDLE_RMS_GATE_SUM_SQUARES)
+            for i in range(num_frames):
+                if quiet[i]:
+                    state.idle_skip_counter += 1
+                    if state.idle_skip_counter % IDLE_MODEL_STRIDE:
+                        voiced[i] = False
+                else:
+                    state.idle_skip_counter = 0
+
+        if voiced.any():
+            # Boolean indexing copies, so hand over the scratch window as-is when
+            # every frame is voiced (the batcher copies it into its staging tensor)
+            model_input = audio_f32 if voiced.all() else audio_f32[voiced]
+            speech_probs[voiced] = await self.batcher.infer(state, model_input)
+
+        return speech_probs
 
     async def _process_frame(
         self,
         state: VadState,
-        frame_bytes: bytes,
+        frame_view: memoryview,
+        action: int,
         on_utterance_detected
     ):
-        """Process a single audio frame."""
-        if len(frame_bytes) != FRAME_BYTES:
-            logger.warning(f"Unexpected frame size {len(frame_bytes)}, expected {FRAME_BYTES}")
-            return
-
-        # Convert PCM → float
-        audio_np = np.frombuffer(frame_bytes, dtype=np.int16).astype(np.float32)
-        audio_f32 = audio_np / 32768.0
-
-        # RMS Noise Gate
-        rms = np.sqrt(np.mean(audio_f32 ** 2))
-        if rms < RMS_NOISE_GATE:
-            speech_prob = 0.0
-        else:
-            with torch.no_grad():
-                speech_prob = self.model(
-                    torch.from_numpy(audio_f32),
-                    SAMPLE_RATE
-                ).item()
-
-        # Probability-weighted decision
-        if speech_prob > STRONG_SPEECH_PROB:
-            is_speech = True
-        elif speech_prob < WEAK_SPEECH_PROB:
-            is_speech = False
-        else:
-            is_speech = False  # treat uncertain as noise
-
-        # Update rolling decision buffer
-        state.vad_decision_buffer.append(is_speech)
-        speech_frames = state.vad_decision_buffer.count(True)
-        total_frames = len(state.vad_decision_buffer)
-        speech_ratio = speech_frames / total_frames if total_frames else 0.0
+        """Apply one frame's state machine action to the connection's audio buffers.
 
+        frame_view is normally a zero-copy view into the received chunk; it is
+        only copied into the pre-speech ring and the speech buffer.
+        """
         # Always collect pre-speech audio
-        state.pre_speech_buffer.append(frame_bytes)
-
-        # STATE MACHINE
-        # ---------------- SPEECH START ----------------
-        if not state.in_speech:
-            if (
-                speech_ratio >= SPEECH_TRIGGER_RATIO and
-                speech_frames >= int(0.6 * total_frames)
-            ):
-                state.in_speech = True
-                state.speech_start_time = time.time()
-                state.current_utterance_id = f"utt_{int(time.time() * 1000)}"
-
-                logger.info("🎙️ >>> Speech started")
+        offset = state.pre_head * FRAME_BYTES
+        state.pre_ring_view[offset:offset + FRAME_BYTES] = frame_view
+        state.pre_head = (state.pre_head + 1) % PRE_SPEECH_FRAMES
+        state.pre_filled = min(state.pre_filled + 1, PRE_SPEECH_FRAMES)
 
-                # Prepend pre-speech
-                for f in state.pre_speech_buffer:
-                    state.speech_buffer.extend(f)
-
-                state.speech_buffer.extend(frame_bytes)
-                state.trailing_silence_buffer.clear()
+        if action == ACTION_IDLE:
+            return
 
-        # ---------------- SPEECH CONTINUE ----------------
-        else:
-            state.speech_buffer.extend(frame_bytes)
+        # ---------------- SPEECH START ----------------
+        if action == ACTION_START:
+            state.current_utterance_id = f"utt_{next(self._utt_counter):x}"
 
-            if speech_ratio < SPEECH_RELEASE_RATIO:
-                state.trailing_silence_buffer.append(frame_bytes)
+            logger.info("🎙️ >>> Speech started")
 
-                if len(state.trailing_silence_buffer) == state.trailing_silence_buffer.maxlen:
-                    logger.info("🛑 <<< Speech ended (silence)")
+            state.speech_buffer = pcm_buffer_pool.acquire()
 
-                    # MIN_UTTERANCE_SAMPLES is in samples, convert to bytes (2 bytes per sample)
-                    min_utterance_bytes = MIN_UTTERANCE_SAMPLES * 2
-                    if len(state.speech_buffer) >= min_utterance_bytes:
-                        logger.info(
-                            f"📤 Sending utterance to ASR "
-                            f"({len(state.speech_buffer)} bytes)"
-                        )
+            # Prepend pre-speech, oldest frame first (the ring may wrap)
+            if state.pre_filled == PRE_SPEECH_FRAMES:
+                split = state.pre_head * FRAME_BYTES
+                state.speech_buffer.extend(state.pre_ring_view[split:])
+                state.speech_buffer.extend(state.pre_ring_view[:split])
+            else:
+                state.speech_buffer.extend(state.pre_ring_view[:state.pre_filled * FRAME_BYTES])
 
-                        if on_utterance_detected:
-                            await on_utterance_detected(bytes(state.speech_buffer))
-                    else:
-                        logger.warning("🗑️ Utterance too short, discarded")
+            state.speech_buffer.extend(frame_view)
+            return
 
-                    state.reset()
+        # ---------------- SPEECH CONTINUE ----------------
+        state.speech_buffer.extend(frame_view)
+
+        # ---------------- SPEECH END ----------------
+        if action == ACTION_END:
+            logger.info("🛑 <<< Speech ended (silence)")
+
+            # MIN_UTTERANCE_SAMPLES is in samples, convert to bytes (2 bytes per sample)
+            min_utterance_bytes = MIN_UTTERANCE_SAMPLES * 2
+            if len(state.speech_buffer) >= min_utterance_bytes:
+                logger.info(
+                    f"📤 Sending utterance to ASR "
+                    f"({len(state.speech_buffer)} bytes)"
+                )
+
+                if on_utterance_detected:
+                    # Hand the speech buffer itself to the callback instead of a
+                    # copy; the connection takes a fresh one at the next speech start.
+                    # Dispatch without waiting so this connection's VAD can move on
+                    # to the next utterance while downstream handles this one
+                    buffer, state.speech_buffer = state.speech_buffer, None
+                    utterance = buffer.view().toreadonly()
+                    task = asyncio.create_task(on_utterance_detected(utterance))
+                    self._pending[task] = (buffer, utterance)
+                    task.add_done_callback(self._on_utterance_task_done)
             else:
-                state.trailing_silence_buffer.clear()
+                logger.warning("🗑️ Utterance too short, discarded")
+
+            state.end_utterance()
 
 
 # Global VAD service instance